@@ -0,0 +1,127 @@
+"""
+Brief: This file contains an import-time benchmark for the Python entry points.
+
+Description: This file runs each entry point (`server`, `main`, `client`) in a fresh interpreter with
+`python -X importtime`, parses the timings written to stderr and compares the cumulative import time of
+the entry point against a budget in milliseconds. It also checks that heavy dependencies which are only
+needed on the ingestion path (`pandas`, `astrapy`, `instaloader`, `tqdm`) are not loaded at startup.
+The script exits with a non-zero status when a budget is exceeded or a heavy dependency is imported
+eagerly, so it can be used as a CI gate.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --module server --budget-ms 400 --runs 5
+
+Author: Team Genz-AI
+
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BUDGETS_MS = {
+    "server": 600,
+    "main": 400,
+    "client": 2500,
+}
+
+# `streamlit` imports pandas itself, so the client is only held to the dependencies it can avoid.
+LAZY_MODULES = {
+    "server": ("pandas", "astrapy", "instaloader", "tqdm"),
+    "main": ("pandas", "astrapy", "instaloader", "tqdm"),
+    "client": ("astrapy", "instaloader"),
+}
+
+
+def measure_import(module: str) -> tuple:
+    """
+    Import a module in a fresh interpreter with `-X importtime`.
+
+    :param module: The name of the module to import.
+    :return: A tuple of the cumulative import time in milliseconds and the set of imported top-level packages.
+    :raises RuntimeError: If the module fails to import.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Failed to import '{module}':\n{result.stderr}")
+
+    cumulative_us = None
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = [field.strip() for field in line[len("import time:"):].split("|")]
+        if len(fields) != 3 or not fields[1].isdigit():
+            continue
+        name = fields[2].strip()
+        imported.add(name.split(".")[0])
+        if name == module:
+            cumulative_us = int(fields[1])
+
+    if cumulative_us is None:
+        raise RuntimeError(f"No import time recorded for '{module}'.")
+
+    return cumulative_us / 1000, imported
+
+
+def check_module(module: str, budget_ms: float, runs: int) -> bool:
+    """
+    Measure a module several times and compare the median against the budget.
+
+    :param module: The name of the module to check.
+    :param budget_ms: The maximum allowed median import time in milliseconds.
+    :param runs: The number of fresh interpreters to measure.
+    :return: True if the module is within budget and imports no lazy dependency eagerly.
+    """
+    timings = []
+    imported = set()
+    for _ in range(runs):
+        elapsed_ms, imported = measure_import(module)
+        timings.append(elapsed_ms)
+
+    median_ms = statistics.median(timings)
+    eager = sorted(name for name in LAZY_MODULES[module] if name in imported)
+
+    ok = median_ms <= budget_ms and not eager
+    status = "OK" if ok else "FAIL"
+    print(f"[{status}] {module}: {median_ms:.1f} ms (budget {budget_ms:.0f} ms, {runs} runs)")
+    if eager:
+        print(f"       eagerly imported: {', '.join(eager)}")
+    return ok
+
+
+def main():
+    """
+    Parse the command line arguments and run the benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Import-time budget check for the entry points.")
+    parser.add_argument(
+        "--module",
+        action="append",
+        choices=sorted(DEFAULT_BUDGETS_MS),
+        help="Entry point to check (repeatable, default: all).",
+    )
+    parser.add_argument("--budget-ms", type=float, help="Override the budget for every checked module.")
+    parser.add_argument("--runs", type=int, default=5, help="Number of measurements per module (default: 5).")
+    args = parser.parse_args()
+
+    modules = args.module or sorted(DEFAULT_BUDGETS_MS)
+    results = [
+        check_module(module, args.budget_ms or DEFAULT_BUDGETS_MS[module], args.runs)
+        for module in modules
+    ]
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,3 @@
-import os
-import time
 import logging
 import streamlit as st
 from streamlit_chat import message
@@ -7,9 +5,14 @@ from dotenv import load_dotenv
 from services.instagram_service import fetch_data
 from services.db_service import (
     connect_to_database,
-    create_or_get_collection,
     upload_csv_to_vector_collection,
 )
+from services.partition_service import (
+    get_partition_config,
+    normalize_profile,
+    refresh_profile_partition,
+    resolve_query_route,
+)
 from services.search_service import vector_search
 from errors.runtime_error import RuntimeError
 from errors.value_error import ValueError
@@ -18,25 +21,33 @@ logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+HISTORY_WINDOW = 20
+QUERY_CACHE_TTL = 600
+
+@st.cache_resource(show_spinner=False)
+def get_database():
+    return connect_to_database()
+
 def process_data(instagram_id: str):
-    collection_name = os.environ.get("ASTRA_DB_COLLECTION_NAME")
-    if not collection_name:
-        raise ValueError("ASTRA_DB_COLLECTION_NAME environment variable is not set.")
+    profile = normalize_profile(instagram_id)
+    get_partition_config()
 
     try:
-        database = connect_to_database()
-        collection = create_or_get_collection(database, collection_name)
-        csv = fetch_data(instagram_id)
-        upload_csv_to_vector_collection(collection, csv, "vectorize")
+        database = get_database()
+        csv = fetch_data(profile)
+        with refresh_profile_partition(database, profile) as collection:
+            upload_csv_to_vector_collection(collection, csv, "vectorize")
     except Exception as e:
         raise RuntimeError(f"An error occurred during data upload: {str(e)}") from e
 
-def process_query(query: str):
+@st.cache_data(ttl=QUERY_CACHE_TTL, show_spinner=False)
+def process_query(query: str, instagram_id: str = None):
     if not query or not isinstance(query, str):
         raise ValueError("The query must be a non-empty string.")
 
     try:
-        response = vector_search(query)
+        collection_name, search_filter = resolve_query_route(instagram_id, get_database)
+        response = vector_search(query, collection_name, search_filter)
         message = response["outputs"][0]["outputs"][0]["results"]["message"]["data"][
             "text"
         ]
@@ -52,6 +63,21 @@ def process_query(query: str):
     except Exception as e:
         raise RuntimeError(f"An error occurred during vector search: {str(e)}") from e
 
+def add_message(role: str, content: str):
+    st.session_state.messages.append({"id": st.session_state.next_message_id, "role": role, "content": content})
+    st.session_state.next_message_id += 1
+
+def render_history(placeholder):
+    messages = st.session_state.messages
+    hidden = max(len(messages) - st.session_state.history_window, 0)
+
+    with placeholder.container():
+        if hidden and st.button(f"Show older messages ({hidden} hidden)", key="show_older"):
+            st.session_state.history_window += HISTORY_WINDOW
+            st.rerun()
+        for msg in messages[hidden:]:
+            message(msg["content"], is_user=msg["role"] == "user", key=f"{msg['role']}-{msg['id']}")
+
 def main():
     load_dotenv()
     st.set_page_config(page_title="InstaIQ", page_icon="🤖", layout="wide")
@@ -166,7 +192,9 @@ def main():
 
             try:
                 process_data(instagram_id)
+                process_query.clear()
                 st.success(f"Data for Instagram ID {instagram_id} has been successfully processed!")
+                st.session_state.profile_id = instagram_id
                 st.session_state.instagram_processed = True  
                 st.rerun()
             except Exception as e:
@@ -174,18 +202,14 @@ def main():
 
     if st.session_state.instagram_processed:
         if "messages" not in st.session_state:
-            st.session_state.messages = [{"role": "assistant", "content": "Hi! Ask me anything about your profile 🤖"}]
+            st.session_state.messages = []
+            st.session_state.next_message_id = 0
+            st.session_state.history_window = HISTORY_WINDOW
+            add_message("assistant", "Hi! Ask me anything about your profile 🤖")
 
         chat_placeholder = st.empty()
         chat_placeholder.markdown('<div class="chat-container">', unsafe_allow_html=True)
 
-        with chat_placeholder.container():
-            for idx, msg in enumerate(st.session_state.messages):
-                if msg["role"] == "assistant":
-                    message(msg["content"], is_user=False, key=f"assistant-{time.time()}-{idx}")
-                else:
-                    message(msg["content"], is_user=True, key=f"user-{time.time()}-{idx}")
-        
         st.markdown('<div style="height: 10vh;"></div>', unsafe_allow_html=True)
         
         col1, col2 = st.columns([9, 1]) 
@@ -199,32 +223,22 @@ def main():
                 st.rerun()
 
         if query:
-            st.session_state.messages.append({"role": "user", "content": query})
+            add_message("user", query)
+            st.session_state.history_window = HISTORY_WINDOW
+            render_history(chat_placeholder)
 
             with st.spinner("Bot is thinking..."):
                 try:
-                    response, extracted_message = process_query(query)
-                    st.session_state.messages.append({"role": "assistant", "content": extracted_message})
-                    chat_placeholder.empty()
-                    with chat_placeholder.container():
-                        for idx, msg in enumerate(st.session_state.messages):
-                            if msg["role"] == "assistant":
-                                message(msg["content"], is_user=False, key=f"assistant-{time.time()}-{idx}")
-                            else:
-                                message(msg["content"], is_user=True, key=f"user-{time.time()}-{idx}")
+                    response, extracted_message = process_query(query, st.session_state.get("profile_id"))
+                    add_message("assistant", extracted_message)
                 except Exception as e:
-                    error_msg = f"❌ An error occurred: {str(e)}"
-                    st.session_state.messages.append({"role": "assistant", "content": error_msg})
-                    chat_placeholder.empty()
-                    with chat_placeholder.container():
-                        for idx, msg in enumerate(st.session_state.messages):
-                            if msg["role"] == "assistant":
-                                message(msg["content"], is_user=False, key=f"assistant-{time.time()}-{idx}")
-                            else:
-                                message(msg["content"], is_user=True, key=f"user-{time.time()}-{idx}")
+                    add_message("assistant", f"❌ An error occurred: {str(e)}")
+            st.rerun()
         elif query == "":
             st.warning("⚠️ Please provide a Query.")
 
+        render_history(chat_placeholder)
+
     st.markdown(
         """
         <div class="footer">
@@ -0,0 +1,8 @@
+class ConflictError(Exception):
+    """
+    Custom exception for operations that conflict with one already in progress.
+    """
+
+    def __init__(self, message="The operation is already in progress"):
+        self.message = message
+        super().__init__(self.message)
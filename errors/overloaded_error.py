@@ -0,0 +1,9 @@
+class OverloadedError(Exception):
+    """
+    Custom exception for requests rejected because a queue is full.
+    """
+
+    def __init__(self, message="The server is overloaded", retry_after=1):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(self.message)
@@ -10,15 +10,19 @@ Author: Team Genz-AI
 ``
 """
 
-import os
 import logging
 from dotenv import load_dotenv
 from services.instagram_service import fetch_data
 from services.db_service import (
     connect_to_database,
-    create_or_get_collection,
     upload_csv_to_vector_collection,
 )
+from services.partition_service import (
+    get_partition_config,
+    normalize_profile,
+    refresh_profile_partition,
+    resolve_query_route,
+)
 from services.search_service import vector_search
 from errors.runtime_error import RuntimeError
 from errors.value_error import ValueError
@@ -34,27 +38,27 @@ def process_data(instagram_id: str):
 
     :param instagram_id: The Instagram user ID for which data is to be fetched.
     :return: A message indicating the success of the data upload operation.
-    :raises ValueError: If the `ASTRA_DB_COLLECTION_NAME` environment variable is not set.
+    :raises ValueError: If the Instagram user ID is empty.
     :raises RuntimeError: If data upload fails.
     """
-    collection_name = os.environ.get("ASTRA_DB_COLLECTION_NAME")
-    if not collection_name:
-        raise ValueError("ASTRA_DB_COLLECTION_NAME environment variable is not set.")
+    profile = normalize_profile(instagram_id)
+    get_partition_config()
 
     try:
         database = connect_to_database()
-        collection = create_or_get_collection(database, collection_name)
-        csv = fetch_data(instagram_id)
-        upload_csv_to_vector_collection(collection, csv, "vectorize")
+        csv = fetch_data(profile)
+        with refresh_profile_partition(database, profile) as collection:
+            upload_csv_to_vector_collection(collection, csv, "vectorize")
     except Exception as e:
         raise RuntimeError(f"An error occurred during data upload: {str(e)}") from e
 
 
-def process_query(query: str):
+def process_query(query: str, instagram_id: str = None):
     """
     Perform a vector search using the specified query message.
 
     :param query: The input message for the vector search.
+    :param instagram_id: The Instagram user ID whose partition should be searched (optional).
     :return: A tuple containing the full JSON response and the extracted answer.
     :raises ValueError: If the query is empty or invalid.
     :raises RuntimeError: If the vector search fails or the response format is invalid.
@@ -63,7 +67,8 @@ def process_query(query: str):
         raise ValueError("The query must be a non-empty string.")
 
     try:
-        response = vector_search(query)
+        collection_name, search_filter = resolve_query_route(instagram_id)
+        response = vector_search(query, collection_name, search_filter)
         message = response["outputs"][0]["outputs"][0]["results"]["message"]["data"][
             "text"
         ]
@@ -90,7 +95,7 @@ def main():
 
     try:
         process_data(instagram_id)
-        response, message = process_query(query)
+        response, message = process_query(query, instagram_id)
         print("\n--- Results ---")
         print("Full Response:", response)
         print("Extracted Answer:", message)
@@ -1,14 +1,24 @@
 from flask import Flask, request, jsonify
 from dotenv import load_dotenv
-import os
 import logging
+import threading
 from services.instagram_service import fetch_data
 from services.db_service import (
     connect_to_database,
-    create_or_get_collection,
     upload_csv_to_vector_collection,
 )
+from services.partition_service import (
+    get_partition_config,
+    normalize_profile,
+    refresh_profile_partition,
+    delete_profile,
+    resolve_query_route,
+)
 from services.search_service import vector_search
+from services.admission_service import create_admission_queues, ProfileLocks
+from services.profiling_service import register_profiler, stage
+from errors.conflict_error import ConflictError
+from errors.overloaded_error import OverloadedError
 from errors.runtime_error import RuntimeError
 from errors.value_error import ValueError
 
@@ -20,6 +30,28 @@ logging.basicConfig(
 
 load_dotenv()
 
+query_queue, ingest_queue = create_admission_queues()
+profile_locks = ProfileLocks()
+register_profiler(app)
+
+_database = None
+_database_lock = threading.Lock()
+
+
+def get_database():
+    """
+    Returns the database connection shared by all requests, connecting on first use.
+
+    :return: The connected database instance.
+    :raises RuntimeError: If the connection fails.
+    """
+    global _database
+    with _database_lock:
+        if _database is None:
+            _database = connect_to_database()
+        return _database
+
+
 @app.route("/process_data", methods=["POST"])
 def process_data_api():
     """
@@ -42,17 +74,22 @@ def process_data_api():
         if not instagram_id:
             return jsonify({"error": "Instagram ID is required."}), 400
 
-        collection_name = os.environ.get("ASTRA_DB_COLLECTION_NAME")
-        if not collection_name:
-            raise ValueError("ASTRA_DB_COLLECTION_NAME environment variable is not set.")
-
-        database = connect_to_database()
-        collection = create_or_get_collection(database, collection_name)
-        csv = fetch_data(instagram_id)
-        upload_csv_to_vector_collection(collection, csv, "vectorize")
+        profile = normalize_profile(instagram_id)
+        get_partition_config()
+        with profile_locks.hold(profile), ingest_queue.admit():
+            database = get_database()
+            csv = fetch_data(profile)
+            with refresh_profile_partition(database, profile) as collection:
+                upload_csv_to_vector_collection(collection, csv, "vectorize")
 
         return jsonify({"message": f"Data processed successfully for Instagram ID {instagram_id}."}), 200
 
+    except OverloadedError as oe:
+        logging.warning(str(oe))
+        return jsonify({"error": str(oe)}), 429, {"Retry-After": str(oe.retry_after)}
+    except ConflictError as ce:
+        logging.warning(str(ce))
+        return jsonify({"error": str(ce)}), 409
     except ValueError as ve:
         logging.error(str(ve))
         return jsonify({"error": str(ve)}), 400
@@ -71,7 +108,8 @@ def process_query_api():
     
     Request JSON Body:
     {
-        "query": "<Query String>"
+        "query": "<Query String>",
+        "instagram_id": "<Instagram User ID>"  (optional, routes the search to the profile's partition)
     }
 
     Response:
@@ -87,14 +125,66 @@ def process_query_api():
         if not query:
             return jsonify({"error": "Query string is required."}), 400
 
-        response = vector_search(query)
+        with query_queue.admit():
+            collection_name, search_filter = resolve_query_route(data.get("instagram_id"), get_database)
+            response = vector_search(query, collection_name, search_filter)
         message = response["outputs"][0]["outputs"][0]["results"]["message"]["data"]["text"]
 
         if not message:
             raise RuntimeError("The response format is invalid or does not contain the expected 'message' field.")
 
-        return jsonify({"response": response, "message": message}), 200
+        with stage("json_encoding"):
+            body = jsonify({"response": response, "message": message})
+        return body, 200
+
+    except OverloadedError as oe:
+        logging.warning(str(oe))
+        return jsonify({"error": str(oe)}), 429, {"Retry-After": str(oe.retry_after)}
+    except ValueError as ve:
+        logging.error(str(ve))
+        return jsonify({"error": str(ve)}), 400
+    except RuntimeError as re:
+        logging.error(str(re))
+        return jsonify({"error": str(re)}), 500
+    except Exception as e:
+        logging.error(str(e))
+        return jsonify({"error": "An unexpected error occurred."}), 500
+
+
+@app.route("/delete_profile", methods=["POST"])
+def delete_profile_api():
+    """
+    API to delete an Instagram profile's data from the vector database.
+
+    Request JSON Body:
+    {
+        "instagram_id": "<Instagram User ID>"
+    }
+
+    Response:
+    {
+        "message": "Data deleted successfully for Instagram ID <id>."
+    }
+    """
+    try:
+        data = request.json
+        instagram_id = data.get("instagram_id")
 
+        if not instagram_id:
+            return jsonify({"error": "Instagram ID is required."}), 400
+
+        profile = normalize_profile(instagram_id)
+        with profile_locks.hold(profile):
+            deleted = delete_profile(get_database(), profile)
+
+        if not deleted:
+            return jsonify({"error": f"No data found for Instagram ID {instagram_id}."}), 404
+
+        return jsonify({"message": f"Data deleted successfully for Instagram ID {instagram_id}."}), 200
+
+    except ConflictError as ce:
+        logging.warning(str(ce))
+        return jsonify({"error": str(ce)}), 409
     except ValueError as ve:
         logging.error(str(ve))
         return jsonify({"error": str(ve)}), 400
@@ -106,5 +196,24 @@ def process_query_api():
         return jsonify({"error": "An unexpected error occurred."}), 500
 
 
+@app.route("/admission_stats", methods=["GET"])
+def admission_stats_api():
+    """
+    API to inspect the admission queues.
+
+    Response:
+    {
+        "query": <Query Queue Stats>,
+        "ingestion": <Ingestion Queue Stats>,
+        "profiles_in_progress": ["<Instagram User ID>", ...]
+    }
+    """
+    return jsonify({
+        "query": query_queue.stats(),
+        "ingestion": ingest_queue.stats(),
+        "profiles_in_progress": profile_locks.active_profiles(),
+    }), 200
+
+
 if __name__ == "__main__":
     app.run(debug=True)
@@ -0,0 +1,204 @@
+"""
+Brief: This file contains the admission control used by the API endpoints.
+
+Description: This file contains the `AdmissionQueue` class, which bounds the number of requests running
+concurrently and the number waiting for a slot, and the `ProfileLocks` class, which prevents the same
+Instagram profile from being ingested or deleted while another operation on it is in progress. When a
+queue is full, or a request waits longer than the queue timeout, an `OverloadedError` carrying a
+`Retry-After` estimate is raised so the endpoint can answer with a fast 429. An ingestion queue can be
+configured to yield to the query queue, so that waiting queries are admitted before new scrapes start.
+Limits are per process; with several workers the effective limit is multiplied by the worker count.
+
+The limits are read by `create_admission_queues` from the following environment variables:
+- QUERY_MAX_CONCURRENT / QUERY_MAX_QUEUE / QUERY_QUEUE_TIMEOUT
+- INGEST_MAX_CONCURRENT / INGEST_MAX_QUEUE / INGEST_QUEUE_TIMEOUT
+
+Author: Team Genz-AI
+
+"""
+
+import math
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from services.config_service import env_number
+from services.profiling_service import record_stage
+from errors.conflict_error import ConflictError
+from errors.overloaded_error import OverloadedError
+from errors.value_error import ValueError
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+POLL_INTERVAL_SECONDS = 0.1
+
+
+class AdmissionQueue:
+    """
+    Bounded admission queue limiting concurrent and waiting requests.
+    """
+
+    def __init__(self, name: str, max_concurrent: int, max_waiting: int, timeout: float, yield_to=None):
+        """
+        :param name: The name of the queue, used in logs and stats.
+        :param max_concurrent: The maximum number of requests running at once.
+        :param max_waiting: The maximum number of requests waiting for a slot.
+        :param timeout: The maximum time in seconds a request waits for a slot.
+        :param yield_to: Another queue whose waiting requests take priority over this one.
+        :raises ValueError: If the limits are invalid.
+        """
+        if max_concurrent < 1 or max_waiting < 0 or timeout < 0:
+            raise ValueError(f"Invalid limits for admission queue '{name}'.")
+
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+        self.yield_to = yield_to
+
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.avg_service_time = 1.0
+        self._condition = threading.Condition()
+
+    def _has_slot(self) -> bool:
+        if self.active >= self.max_concurrent:
+            return False
+        return not (self.yield_to and self.yield_to.waiting)
+
+    def retry_after(self) -> int:
+        """
+        Estimates how many seconds a rejected client should wait before retrying.
+
+        :return: The estimate in whole seconds, at least 1.
+        """
+        backlog = (self.waiting + 1) / self.max_concurrent
+        return max(1, math.ceil(backlog * self.avg_service_time))
+
+    def _reject(self, reason: str):
+        self.rejected += 1
+        retry_after = self.retry_after()
+        logging.warning(f"Admission queue '{self.name}' rejected a request: {reason}.")
+        raise OverloadedError(f"The {self.name} queue is {reason}. Please retry later.", retry_after)
+
+    @contextmanager
+    def admit(self):
+        """
+        Waits for a slot in the queue and holds it for the duration of the `with` block.
+
+        :raises OverloadedError: If the queue is full or no slot frees up before the timeout.
+        """
+        start = time.monotonic()
+        with self._condition:
+            if not self._has_slot():
+                if self.waiting >= self.max_waiting:
+                    self._reject("full")
+
+                self.waiting += 1
+                try:
+                    while not self._has_slot():
+                        remaining = self.timeout - (time.monotonic() - start)
+                        if remaining <= 0:
+                            self._reject("busy")
+                        self._condition.wait(min(remaining, POLL_INTERVAL_SECONDS))
+                finally:
+                    self.waiting -= 1
+
+            waited = time.monotonic() - start
+            self.active += 1
+            self.admitted += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        record_stage(f"{self.name}_queue_wait", waited)
+
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._condition:
+                self.active -= 1
+                self.avg_service_time = 0.8 * self.avg_service_time + 0.2 * (time.monotonic() - started)
+                self._condition.notify()
+
+    def stats(self) -> dict:
+        """
+        Returns the current depth and wait time statistics of the queue.
+
+        :return: A dictionary of queue statistics.
+        """
+        with self._condition:
+            return {
+                "active": self.active,
+                "waiting": self.waiting,
+                "max_concurrent": self.max_concurrent,
+                "max_waiting": self.max_waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "avg_wait_seconds": round(self.total_wait / self.admitted, 3) if self.admitted else 0.0,
+                "max_wait_seconds": round(self.max_wait, 3),
+                "avg_service_seconds": round(self.avg_service_time, 3),
+            }
+
+
+class ProfileLocks:
+    """
+    Non-blocking per-profile locks preventing concurrent ingestion or deletion of the same profile.
+    """
+
+    def __init__(self):
+        self._active = set()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, profile: str):
+        """
+        Holds the lock of a profile for the duration of the `with` block.
+
+        :param profile: The normalized Instagram profile name.
+        :raises ConflictError: If the profile is already being processed.
+        """
+        with self._lock:
+            if profile in self._active:
+                raise ConflictError(f"Instagram ID {profile} is already being processed.")
+            self._active.add(profile)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._active.discard(profile)
+
+    def active_profiles(self) -> list:
+        """
+        :return: The sorted list of profiles currently being processed.
+        """
+        with self._lock:
+            return sorted(self._active)
+
+
+def create_admission_queues() -> tuple:
+    """
+    Creates the query and ingestion queues from environment variables. Ingestion yields to waiting queries.
+
+    :return: A tuple of the query queue and the ingestion queue.
+    :raises ValueError: If a limit is invalid.
+    """
+    query_queue = AdmissionQueue(
+        "query",
+        env_number("QUERY_MAX_CONCURRENT", 8, int),
+        env_number("QUERY_MAX_QUEUE", 32, int),
+        env_number("QUERY_QUEUE_TIMEOUT", 10),
+    )
+    ingest_queue = AdmissionQueue(
+        "ingestion",
+        env_number("INGEST_MAX_CONCURRENT", 2, int),
+        env_number("INGEST_MAX_QUEUE", 4, int),
+        env_number("INGEST_QUEUE_TIMEOUT", 30),
+        yield_to=query_queue,
+    )
+    return query_queue, ingest_queue
@@ -0,0 +1,28 @@
+"""
+Brief: This file contains helpers to read configuration from environment variables.
+
+Description: This file contains the function `env_number`, which reads a numeric setting from an environment
+variable with a default, and raises a `ValueError` when the value cannot be converted.
+
+Author: Team Genz-AI
+
+"""
+
+import os
+from errors.value_error import ValueError
+
+
+def env_number(name: str, default, cast=float):
+    """
+    Reads a numeric setting from an environment variable.
+
+    :param name: The name of the environment variable.
+    :param default: The value used when the variable is not set.
+    :param cast: The numeric type to convert the value to (default is float).
+    :return: The converted value.
+    :raises ValueError: If the value cannot be converted.
+    """
+    try:
+        return cast(os.environ.get(name, default))
+    except Exception:
+        raise ValueError(f"{name} environment variable must be a number.")
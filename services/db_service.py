@@ -6,7 +6,11 @@ Description: This file contains the functions `connect_to_database`, `create_or_
 The `connect_to_database` function connects to the Astra database using environment variables for the endpoint 
 and token. The `create_or_get_collection` function fetches an existing collection from the database or creates 
 a new one if it does not exist. The `upload_csv_to_vector_collection` function uploads in-memory CSV data to 
-a vector collection, chunking the data to avoid performance issues.
+a vector collection, chunking the data to avoid performance issues, either through server-side `$vectorize` 
+or with precomputed `$vector` embeddings.
+
+Heavy dependencies (`pandas`, `astrapy`) are imported inside the functions that need them, so importing 
+this module stays cheap for workers that only serve queries.
 
 Author: Team Genz-AI
 
@@ -14,18 +18,19 @@ Author: Team Genz-AI
 
 import os, ast, io
 import logging
-import pandas as pd
-from astrapy import DataAPIClient, Database
-from astrapy.constants import VectorMetric
+from typing import TYPE_CHECKING
 from errors.runtime_error import RuntimeError
 from errors.value_error import ValueError
 
+if TYPE_CHECKING:
+    from astrapy import Database
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
 
-def connect_to_database() -> Database:
+def connect_to_database() -> "Database":
     """
     Connects to the Astra database using environment variables for the endpoint and token.
 
@@ -33,6 +38,8 @@ def connect_to_database() -> Database:
     :raises ValueError: If connection parameters are missing.
     :raises RuntimeError: If connection parameters are missing or any error occurs during connection.
     """
+    from astrapy import DataAPIClient
+
     try:
         endpoint = os.environ.get("ASTRA_DB_API_ENDPOINT")
         token = os.environ.get("ASTRA_DB_APPLICATION_TOKEN")
@@ -58,81 +65,125 @@ def connect_to_database() -> Database:
         )
 
 
-def create_or_get_collection(database: Database, collection_name: str):
+def create_or_get_collection(
+    database: "Database", collection_name: str, create_options: dict = None
+):
     """
     Fetches an existing collection from the database or creates a new one if it does not exist.
 
     :param database: The database object where the collection is stored.
     :param collection_name: The name of the collection to fetch or create.
+    :param create_options: Extra keyword arguments for `create_collection` (e.g. `dimension`, `service`),
+        used only when the collection has to be created.
     :raises RuntimeError: If an error occurs while creating the collection.
     :return: The collection object.
     """
+    from astrapy.constants import VectorMetric
+
     try:
-        collection = database.get_collection(collection_name)
-        logging.info(f"Collection '{collection_name}' already exists.")
+        existing_names = database.list_collection_names()
     except Exception as e:
-        logging.warning(
-            f"Collection '{collection_name}' does not exist. Creating a new one."
+        logging.error(f"Failed to list collections: {e}")
+        raise RuntimeError(f"Failed to list collections: {e}")
+
+    if collection_name in existing_names:
+        logging.info(f"Collection '{collection_name}' already exists.")
+        return database.get_collection(collection_name)
+
+    logging.warning(
+        f"Collection '{collection_name}' does not exist. Creating a new one."
+    )
+    try:
+        options = {"metric": VectorMetric.COSINE, **(create_options or {})}
+        collection = database.create_collection(collection_name, **options)
+        logging.info(
+            f"Created collection '{collection.full_name}' with COSINE metric."
+        )
+    except Exception as create_error:
+        logging.error(
+            f"Failed to create collection '{collection_name}': {create_error}"
         )
+        raise RuntimeError(
+            f"Failed to create collection '{collection_name}': {create_error}"
+        )
+    return collection
+
+
+def insert_documents(collection, documents: list, chunk_size: int = 50) -> int:
+    """
+    Inserts documents into a collection in chunks, logging chunks that fail and carrying on with the rest.
+
+    :param collection: The collection to insert documents into.
+    :param documents: The documents to insert.
+    :param chunk_size: The size of the chunks to be inserted at once (default is 50).
+    :return: The number of documents inserted.
+    :raises RuntimeError: If not every document was inserted.
+    """
+    total_inserted = 0
+    for i in range(0, len(documents), chunk_size):
+        chunk = documents[i : i + chunk_size]
         try:
-            collection = database.create_collection(
-                collection_name, metric=VectorMetric.COSINE
-            )
+            insertion_result = collection.insert_many(chunk, max_time_ms=20000)
+            chunk_inserted = len(insertion_result.inserted_ids)
+            total_inserted += chunk_inserted
             logging.info(
-                f"Created collection '{collection.full_name}' with COSINE metric."
-            )
-        except Exception as create_error:
-            logging.error(
-                f"Failed to create collection '{collection_name}': {create_error}"
+                f"Inserted {chunk_inserted} items in chunk {i // chunk_size + 1}."
             )
-            raise RuntimeError(
-                f"Failed to create collection '{collection_name}': {create_error}"
-            )
-    return collection
+        except Exception as e:
+            logging.error(f"Error inserting chunk {i // chunk_size + 1}: {e}")
+
+    if total_inserted < len(documents):
+        raise RuntimeError(
+            f"Only {total_inserted} of {len(documents)} items were inserted into the collection."
+        )
+
+    logging.info(
+        f"Successfully inserted {total_inserted} items into the collection."
+    )
+    return total_inserted
 
 
 def upload_csv_to_vector_collection(
-    collection, csv_data: str, vectorize_column: str, chunk_size: int = 50
+    collection, csv_data: str, vectorize_column: str, chunk_size: int = 50, vectors=None
 ):
     """
     Uploads in-memory CSV data to a vector collection, chunking the data to avoid performance issues.
 
+    When `vectors` is given, each row is stored with its precomputed `$vector` and the text in
+    `vectorize_column` is kept as a regular field, so no server-side `$vectorize` embedding is needed.
+
     :param collection: The collection to insert documents into.
     :param csv_data: The in-memory CSV data as a string.
     :param vectorize_column: The name of the column to be used for vectorization.
     :param chunk_size: The size of the chunks to be inserted at once (default is 50).
-    :raises ValueError: If the vectorize_column is not found in the CSV data.
+    :param vectors: Optional precomputed embeddings, one per CSV row (e.g. a 2D NumPy array).
+    :raises ValueError: If the vectorize_column is not found in the CSV data or the vectors do not match the rows.
     :raises RuntimeError: If an unexpected error occurs during the insertion process.
     """
+    import pandas as pd
+
     try:
         df = pd.read_csv(io.StringIO(csv_data))
 
         if vectorize_column not in df.columns:
             raise ValueError(f"Column '{vectorize_column}' not found in the CSV data.")
 
+        if vectors is not None and len(vectors) != len(df):
+            raise ValueError(
+                f"Got {len(vectors)} vectors for {len(df)} CSV rows."
+            )
+
         documents = []
-        for _, row in df.iterrows():
+        for index, (_, row) in enumerate(df.iterrows()):
             document = row.to_dict()
-            document["$vectorize"] = document.pop(vectorize_column)
+            if vectors is None:
+                document["$vectorize"] = document.pop(vectorize_column)
+            else:
+                document["$vector"] = [float(value) for value in vectors[index]]
             document["metadata"] = ast.literal_eval(document["metadata"])
             documents.append(document)
 
-        total_inserted = 0
-        for i in range(0, len(documents), chunk_size):
-            chunk = documents[i : i + chunk_size]
-            try:
-                insertion_result = collection.insert_many(chunk, max_time_ms=20000)
-                chunk_inserted = len(insertion_result.inserted_ids)
-                total_inserted += chunk_inserted
-                logging.info(
-                    f"Inserted {chunk_inserted} items in chunk {i // chunk_size + 1}."
-                )
-            except Exception as e:
-                logging.error(f"Error inserting chunk {i // chunk_size + 1}: {e}")
-
-        logging.info(
-            f"Successfully inserted {total_inserted} items into the collection."
-        )
+        insert_documents(collection, documents, chunk_size)
 
     except ValueError as ve:
         logging.error(f"ValueError: {ve}")
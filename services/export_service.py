@@ -0,0 +1,285 @@
+"""
+Brief: This file contains the functions to export and import precomputed embeddings in bulk.
+
+Description: This file contains the functions `export_vectors` and `import_vectors`, which move documents
+between a collection and a bulk directory made of three files:
+- vectors.npy: A float32 NumPy array of shape (documents, dimension) holding the `$vector` of each document.
+- metadata.parquet: One row per document, in the same order, with every other field. The text embedded by
+  `$vectorize` is stored in the `vectorize` column and the `metadata` dictionary as its string form, matching
+  the CSV produced by `fetch_data`.
+- manifest.json: The document count, vector dimension, source collection and profile.
+Importing checks the files against the manifest and the target collection's vector dimension, then inserts
+the stored `$vector` arrays directly, so collections can be rebuilt, migrated or copied between environments
+without any embedding calls. Imported documents get new `_id`s, so they never collide with the rows they
+replace. `export_profile` and `import_profile` route through the
+profile's partition.
+
+Usage:
+    python -m services.export_service export <instagram_id> <directory>
+    python -m services.export_service import <instagram_id> <directory>
+
+Author: Team Genz-AI
+
+"""
+
+import os
+import ast
+import json
+import logging
+from services.db_service import connect_to_database, insert_documents
+from services.partition_service import (
+    get_partition_config,
+    lookup_partition,
+    normalize_profile,
+    refresh_profile_partition,
+)
+from errors.runtime_error import RuntimeError
+from errors.value_error import ValueError
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+VECTORS_FILE = "vectors.npy"
+METADATA_FILE = "metadata.parquet"
+MANIFEST_FILE = "manifest.json"
+
+
+def export_vectors(collection, directory: str, document_filter: dict = None, profile: str = None) -> int:
+    """
+    Exports the documents of a collection, with their vectors, to a bulk directory.
+
+    :param collection: The collection to export documents from.
+    :param directory: The directory to write the bulk files to (created if missing).
+    :param document_filter: An optional filter selecting the documents to export.
+    :param profile: The profile name recorded in the manifest.
+    :return: The number of exported documents.
+    :raises ValueError: If a document has no `$vector`.
+    :raises RuntimeError: If the documents cannot be read or the files cannot be written.
+    """
+    import numpy as np
+    import pandas as pd
+
+    try:
+        vectors = []
+        rows = []
+        for document in collection.find(document_filter or {}, projection={"*": True}):
+            vector = document.pop("$vector", None)
+            if vector is None:
+                raise ValueError(f"Document '{document.get('_id')}' has no $vector to export.")
+            if "$vectorize" in document:
+                document["vectorize"] = document.pop("$vectorize")
+            if isinstance(document.get("metadata"), dict):
+                document["metadata"] = str(document["metadata"])
+            vectors.append(vector)
+            rows.append(document)
+
+        dimension = len(vectors[0]) if vectors else 0
+        os.makedirs(directory, exist_ok=True)
+        np.save(
+            os.path.join(directory, VECTORS_FILE),
+            np.asarray(vectors, dtype=np.float32).reshape(len(vectors), dimension),
+        )
+        pd.DataFrame(rows).to_parquet(os.path.join(directory, METADATA_FILE), index=False)
+        with open(os.path.join(directory, MANIFEST_FILE), "w") as manifest:
+            json.dump(
+                {
+                    "count": len(rows),
+                    "dimension": dimension,
+                    "collection": collection.name,
+                    "profile": profile,
+                },
+                manifest,
+                indent=2,
+            )
+
+        logging.info(f"Exported {len(rows)} documents from '{collection.name}' to '{directory}'.")
+        return len(rows)
+
+    except ValueError as ve:
+        logging.error(f"ValueError: {ve}")
+        raise
+    except Exception as e:
+        logging.error(f"Unexpected error: {e}")
+        raise RuntimeError(f"An unexpected error occurred during the vector export: {e}")
+
+
+def import_vectors(collection, directory: str, chunk_size: int = 50) -> int:
+    """
+    Imports a bulk directory into a collection using the stored `$vector` arrays.
+
+    :param collection: The collection to insert documents into.
+    :param directory: The directory holding the bulk files.
+    :param chunk_size: The size of the chunks to be inserted at once (default is 50).
+    :return: The number of inserted documents.
+    :raises ValueError: If the bulk files are missing or do not match each other or the manifest.
+    :raises RuntimeError: If an unexpected error occurs during the insertion process.
+    """
+    import numpy as np
+    import pandas as pd
+
+    vectors_path, metadata_path = _bulk_paths(directory)
+    manifest = read_manifest(directory)
+
+    try:
+        vectors = np.load(vectors_path, mmap_mode="r")
+        df = pd.read_parquet(metadata_path)
+
+        if len(vectors) != len(df):
+            raise ValueError(
+                f"{VECTORS_FILE} has {len(vectors)} vectors but {METADATA_FILE} has {len(df)} rows."
+            )
+        if len(df) != manifest["count"] or (len(vectors) and vectors.shape[1] != manifest["dimension"]):
+            raise ValueError(
+                f"The bulk files do not match {MANIFEST_FILE} "
+                f"({manifest['count']} documents of dimension {manifest['dimension']})."
+            )
+
+        documents = []
+        for index, row in enumerate(df.to_dict(orient="records")):
+            document = {
+                key: value for key, value in row.items() if key != "_id" and not _is_missing(value)
+            }
+            if isinstance(document.get("metadata"), str):
+                document["metadata"] = ast.literal_eval(document["metadata"])
+            document["$vector"] = vectors[index].tolist()
+            documents.append(document)
+
+        return insert_documents(collection, documents, chunk_size)
+
+    except ValueError as ve:
+        logging.error(f"ValueError: {ve}")
+        raise
+    except Exception as e:
+        logging.error(f"Unexpected error: {e}")
+        raise RuntimeError(f"An unexpected error occurred during the vector import: {e}")
+
+
+def _bulk_paths(directory: str) -> tuple:
+    vectors_path = os.path.join(directory, VECTORS_FILE)
+    metadata_path = os.path.join(directory, METADATA_FILE)
+    if not (os.path.isfile(vectors_path) and os.path.isfile(metadata_path)):
+        raise ValueError(f"'{directory}' must contain {VECTORS_FILE} and {METADATA_FILE}.")
+    return vectors_path, metadata_path
+
+
+def read_manifest(directory: str) -> dict:
+    """
+    Reads the manifest of a bulk directory.
+
+    :param directory: The directory holding the bulk files.
+    :return: The manifest, with at least the `count` and `dimension` keys.
+    :raises ValueError: If the manifest is missing or invalid.
+    """
+    try:
+        with open(os.path.join(directory, MANIFEST_FILE)) as manifest_file:
+            manifest = json.load(manifest_file)
+        manifest["count"] = int(manifest["count"])
+        manifest["dimension"] = int(manifest["dimension"])
+        return manifest
+    except Exception as e:
+        raise ValueError(f"Invalid or missing {MANIFEST_FILE} in '{directory}': {e}")
+
+
+def check_vector_dimension(collection, dimension: int):
+    """
+    Checks that a collection stores vectors of the given dimension.
+
+    :param collection: The collection to check.
+    :param dimension: The expected vector dimension.
+    :raises ValueError: If the collection is not a vector collection or its dimension differs.
+    """
+    vector = collection.options().vector
+    if not vector or not vector.dimension:
+        raise ValueError(f"Collection '{collection.name}' is not configured for {dimension}-dimensional vectors.")
+    if vector.dimension != dimension:
+        raise ValueError(
+            f"Collection '{collection.name}' stores {vector.dimension}-dimensional vectors, "
+            f"but the export has {dimension}."
+        )
+
+
+def _is_missing(value) -> bool:
+    return value is None or (isinstance(value, float) and value != value)
+
+
+def export_profile(database, profile_name: str, directory: str) -> int:
+    """
+    Exports a profile's documents from its partition to a bulk directory. Profiles ingested before
+    partitioning are exported from the base collection.
+
+    :param database: The connected database instance.
+    :param profile_name: The Instagram profile name.
+    :param directory: The directory to write the bulk files to.
+    :return: The number of exported documents.
+    :raises ValueError: If no documents are found for the profile.
+    """
+    profile = normalize_profile(profile_name)
+    entry = lookup_partition(database, profile, use_cache=False)
+    if entry:
+        partition = entry["partition"]
+        document_filter = None if entry["dedicated"] else {"metadata.username": profile}
+    else:
+        partition = get_partition_config()["base"]
+        document_filter = {"metadata.username": profile}
+
+    count = export_vectors(database.get_collection(partition), directory, document_filter, profile)
+    if not count:
+        raise ValueError(f"No documents found for profile '{profile}'.")
+    return count
+
+
+def import_profile(database, profile_name: str, directory: str) -> int:
+    """
+    Replaces a profile's documents in its partition with the contents of a bulk directory.
+
+    The manifest and the partition's vector dimension are checked before anything is inserted; if the
+    import fails, the profile's previous data stays in place. A missing partition is created with the
+    manifest's dimension when the base collection's vector options cannot be read.
+
+    :param database: The connected database instance.
+    :param profile_name: The Instagram profile name.
+    :param directory: The directory holding the bulk files.
+    :return: The number of inserted documents.
+    :raises ValueError: If the bulk files are missing or do not match the partition.
+    :raises RuntimeError: If fewer documents than the manifest lists were inserted.
+    """
+    _bulk_paths(directory)
+    manifest = read_manifest(directory)
+
+    create_options = {"dimension": manifest["dimension"]} if manifest["dimension"] else None
+    with refresh_profile_partition(database, profile_name, create_options) as collection:
+        if manifest["count"]:
+            check_vector_dimension(collection, manifest["dimension"])
+        inserted = import_vectors(collection, directory)
+        if inserted < manifest["count"]:
+            raise RuntimeError(
+                f"Only {inserted} of the {manifest['count']} exported documents were imported."
+            )
+    return inserted
+
+
+def main():
+    """
+    Command line entry point to export or import a profile's vectors.
+    """
+    import argparse
+    from dotenv import load_dotenv
+
+    parser = argparse.ArgumentParser(description="Bulk export/import of precomputed embeddings.")
+    parser.add_argument("action", choices=["export", "import"])
+    parser.add_argument("instagram_id", help="The Instagram profile to export or import.")
+    parser.add_argument("directory", help="The bulk directory (vectors.npy, metadata.parquet, manifest.json).")
+    args = parser.parse_args()
+
+    load_dotenv()
+    database = connect_to_database()
+    if args.action == "export":
+        count = export_profile(database, args.instagram_id, args.directory)
+    else:
+        count = import_profile(database, args.instagram_id, args.directory)
+    print(f"{args.action.capitalize()}ed {count} documents for Instagram ID {args.instagram_id}.")
+
+
+if __name__ == "__main__":
+    main()
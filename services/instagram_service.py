@@ -14,15 +14,15 @@ following columns:
 - metadata: The metadata of the post.
 - username: The username of the profile.
 
+`instaloader` and `tqdm` are imported on first call to `fetch_data` rather than at module load.
+
 Author: Team Genz-AI
 
 """
 
-import instaloader
 import csv
 import io
 import logging
-from tqdm import tqdm
 from errors.invalid_input_error import InvalidInputError
 from errors.runtime_error import RuntimeError
 
@@ -38,6 +38,9 @@ def fetch_data(profile_name: str) -> str:
     :param profile_name: The Instagram profile name for which the data is to be fetched.
     :return: The data fetched from the profile in CSV format.
     """
+    import instaloader
+    from tqdm import tqdm
+
     if not profile_name.strip():
         raise InvalidInputError(
             "Profile name is empty. Please provide a valid profile name."
@@ -0,0 +1,402 @@
+"""
+Brief: This file contains the functions to partition profiles across Astra DB collections.
+
+Description: This file contains the partitioning layer that sits on top of `create_or_get_collection`. Each
+Instagram profile is mapped to a partition (a collection) and the mapping is stored in a registry collection
+named `<ASTRA_DB_COLLECTION_NAME>_registry`, so ingestion and queries are routed automatically. Two modes are
+supported through the `ASTRA_DB_PARTITION_MODE` environment variable:
+- profile (default): every profile gets its own collection until `ASTRA_DB_MAX_PARTITIONS` dedicated
+  collections exist; further profiles overflow into the shared `ASTRA_DB_COLLECTION_NAME` collection.
+- shard: profiles are hashed into `ASTRA_DB_PARTITION_SHARDS` shared collections.
+Partitions are created lazily on first ingestion, using the vector options of the base collection as a
+template so `$vectorize` keeps working. A refresh writes a dedicated profile into a fresh collection and only
+switches the registry over, dropping the previous collection, once the insert succeeds; deleting a dedicated
+profile drops its collection instead of scanning a shared one. Profiles ingested before partitioning have no
+registry entry and keep being served from the base collection. A new dedicated partition is reserved in the
+registry before its data is uploaded, so concurrent refreshes cannot exceed `ASTRA_DB_MAX_PARTITIONS`; a
+reservation left behind by a crashed process expires after `RESERVATION_TTL_SECONDS`.
+
+Registry lookups for queries are cached per process in a bounded cache that expires after
+`REGISTRY_CACHE_TTL_SECONDS`, so a profile deleted or moved by another process is picked up again quickly.
+Ingestion and deletion always read the registry directly. Lookups never create the registry; until the first
+profile is ingested every profile is treated as unregistered.
+
+Author: Team Genz-AI
+
+"""
+
+import os
+import hashlib
+import logging
+import time
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from services.config_service import env_number
+from services.db_service import connect_to_database, create_or_get_collection
+from errors.runtime_error import RuntimeError
+from errors.value_error import ValueError
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+PARTITION_MODES = ("profile", "shard")
+REGISTRY_SUFFIX = "registry"
+DEFAULT_MAX_PARTITIONS = 8
+DEFAULT_PARTITION_SHARDS = 4
+REGISTRY_CACHE_SIZE = 1024
+REGISTRY_CACHE_TTL_SECONDS = 60
+DELETE_CHUNK_SIZE = 100
+RESERVATION_PREFIX = "pending:"
+RESERVATION_TTL_SECONDS = 3600
+
+_registry_cache = OrderedDict()
+_cache_lock = threading.Lock()
+_lock = threading.Lock()
+
+
+def get_partition_config() -> dict:
+    """
+    Reads the partitioning configuration from environment variables.
+
+    :return: A dictionary with the `base`, `mode`, `max_partitions` and `shards` settings.
+    :raises ValueError: If a variable is missing or invalid.
+    """
+    base = os.environ.get("ASTRA_DB_COLLECTION_NAME")
+    if not base:
+        raise ValueError("ASTRA_DB_COLLECTION_NAME environment variable is not set.")
+
+    mode = os.environ.get("ASTRA_DB_PARTITION_MODE", "profile").lower()
+    if mode not in PARTITION_MODES:
+        raise ValueError(
+            f"ASTRA_DB_PARTITION_MODE must be one of {', '.join(PARTITION_MODES)}, got '{mode}'."
+        )
+
+    max_partitions = env_number("ASTRA_DB_MAX_PARTITIONS", DEFAULT_MAX_PARTITIONS, int)
+    shards = env_number("ASTRA_DB_PARTITION_SHARDS", DEFAULT_PARTITION_SHARDS, int)
+
+    if max_partitions < 0 or shards < 1:
+        raise ValueError("ASTRA_DB_MAX_PARTITIONS must be >= 0 and ASTRA_DB_PARTITION_SHARDS must be >= 1.")
+
+    return {"base": base, "mode": mode, "max_partitions": max_partitions, "shards": shards}
+
+
+def normalize_profile(profile_name: str) -> str:
+    """
+    Normalizes an Instagram profile name so it can be used as a registry key.
+
+    :param profile_name: The Instagram profile name.
+    :return: The lower-cased profile name without surrounding whitespace or a leading '@'.
+    :raises ValueError: If the profile name is empty.
+    """
+    profile = (profile_name or "").strip().lstrip("@").lower()
+    if not profile:
+        raise ValueError("Profile name is empty. Please provide a valid profile name.")
+    return profile
+
+
+def _profile_digest(profile: str) -> str:
+    return hashlib.sha1(profile.encode("utf-8")).hexdigest()
+
+
+def _get_registry(database, config: dict):
+    return create_or_get_collection(
+        database, f"{config['base']}_{REGISTRY_SUFFIX}", {"metric": None}
+    )
+
+
+def _is_missing_collection(error) -> bool:
+    return any(
+        getattr(descriptor, "error_code", None) == "COLLECTION_NOT_EXIST"
+        for descriptor in getattr(error, "error_descriptors", None) or []
+    )
+
+
+def _get_partition(database, config: dict, partition_name: str, fallback_options: dict = None):
+    """
+    Returns the collection for a partition, creating it with the base collection's vector options if needed.
+    `fallback_options` are used instead when the base collection's vector options cannot be read.
+    """
+    create_options = None
+    if partition_name != config["base"]:
+        try:
+            vector = database.get_collection(config["base"]).options().vector
+            if vector:
+                create_options = {
+                    "dimension": vector.dimension,
+                    "metric": vector.metric,
+                    "service": vector.service,
+                }
+        except Exception as e:
+            logging.warning(f"Could not read vector options of '{config['base']}': {e}")
+
+    return create_or_get_collection(database, partition_name, create_options or fallback_options)
+
+
+def _cache_get(profile: str) -> tuple:
+    with _cache_lock:
+        cached = _registry_cache.get(profile)
+        if cached is None:
+            return False, None
+        expires_at, entry = cached
+        if expires_at < time.monotonic():
+            del _registry_cache[profile]
+            return False, None
+        return True, entry
+
+
+def _cache_put(profile: str, entry: dict):
+    with _cache_lock:
+        _registry_cache[profile] = (time.monotonic() + REGISTRY_CACHE_TTL_SECONDS, entry)
+        _registry_cache.move_to_end(profile)
+        while len(_registry_cache) > REGISTRY_CACHE_SIZE:
+            _registry_cache.popitem(last=False)
+
+
+def _cache_evict(profile: str):
+    with _cache_lock:
+        _registry_cache.pop(profile, None)
+
+
+def lookup_partition(database, profile_name: str, use_cache: bool = True) -> dict:
+    """
+    Looks up the registry entry of a profile.
+
+    :param database: The connected database instance.
+    :param profile_name: The Instagram profile name.
+    :param use_cache: Whether a cached entry may be returned instead of reading the registry.
+    :return: The registry entry (`_id`, `partition`, `dedicated`) or None if the profile is not registered.
+    :raises RuntimeError: If the registry cannot be read.
+    """
+    profile = normalize_profile(profile_name)
+    if use_cache:
+        hit, entry = _cache_get(profile)
+        if hit:
+            return entry
+
+    config = get_partition_config()
+    try:
+        entry = database.get_collection(f"{config['base']}_{REGISTRY_SUFFIX}").find_one({"_id": profile})
+    except Exception as e:
+        if not _is_missing_collection(e):
+            raise RuntimeError(f"Failed to read the partition registry: {e}")
+        entry = None
+
+    _cache_put(profile, entry)
+    return entry
+
+
+def _plan_partition(registry, config: dict, profile: str, current: dict) -> dict:
+    """
+    Chooses the partition a refresh of the profile writes to. A new dedicated partition is reserved in the
+    registry right away, so concurrent refreshes count it against the partition limit before it is registered.
+    Must be called while holding `_lock`.
+    """
+    digest = _profile_digest(profile)
+    if current and current["dedicated"]:
+        slot = 1 - current.get("slot", 0)
+        return {"_id": profile, "partition": f"{config['base']}_p{digest[:12]}_{slot}", "dedicated": True, "slot": slot}
+    if current:
+        return current
+
+    if config["mode"] == "shard":
+        return {
+            "_id": profile,
+            "partition": f"{config['base']}_s{int(digest, 16) % config['shards']}",
+            "dedicated": False,
+        }
+
+    registry.delete_many({"reserved_at": {"$lt": time.time() - RESERVATION_TTL_SECONDS}})
+    dedicated_count = registry.count_documents(
+        {"dedicated": True}, upper_bound=config["max_partitions"] + 1
+    )
+    if dedicated_count < config["max_partitions"]:
+        registry.replace_one(
+            {"_id": f"{RESERVATION_PREFIX}{profile}"},
+            {"dedicated": True, "reserved_at": time.time()},
+            upsert=True,
+        )
+        return {"_id": profile, "partition": f"{config['base']}_p{digest[:12]}_0", "dedicated": True, "slot": 0}
+
+    logging.warning(
+        f"Partition limit of {config['max_partitions']} reached, "
+        f"profile '{profile}' overflows into '{config['base']}'."
+    )
+    return {"_id": profile, "partition": config["base"], "dedicated": False}
+
+
+def _list_profile_ids(collection, profile: str) -> set:
+    return {
+        document["_id"]
+        for document in collection.find({"metadata.username": profile}, projection={"_id": True})
+    }
+
+
+def _delete_ids(collection, ids: set):
+    ids = list(ids)
+    for i in range(0, len(ids), DELETE_CHUNK_SIZE):
+        collection.delete_many({"_id": {"$in": ids[i : i + DELETE_CHUNK_SIZE]}})
+
+
+def _release_reservation(registry, profile: str):
+    try:
+        registry.delete_one({"_id": f"{RESERVATION_PREFIX}{profile}"})
+    except Exception as e:
+        logging.warning(f"Failed to release the partition reservation of profile '{profile}': {e}")
+
+
+def _discard_refresh(database, collection, target: dict, profile: str, previous_ids: set):
+    """
+    Removes the data written by a failed refresh, leaving the previous data in place.
+    """
+    try:
+        if target["dedicated"]:
+            database.drop_collection(target["partition"])
+        else:
+            _delete_ids(collection, _list_profile_ids(collection, profile) - previous_ids)
+    except Exception as e:
+        logging.error(f"Failed to discard the partial refresh of profile '{profile}': {e}")
+
+
+def _cleanup_previous(database, config: dict, profile: str, current: dict, target: dict, collection, previous_ids):
+    """
+    Removes the data a successful refresh replaced.
+    """
+    try:
+        if not target["dedicated"]:
+            _delete_ids(collection, previous_ids)
+        elif current and current["dedicated"]:
+            database.drop_collection(current["partition"])
+
+        if current is None and target["partition"] != config["base"]:
+            database.get_collection(config["base"]).delete_many({"metadata.username": profile})
+    except Exception as e:
+        logging.warning(f"Failed to remove the previous data of profile '{profile}': {e}")
+
+
+@contextmanager
+def refresh_profile_partition(database, profile_name: str, create_options: dict = None):
+    """
+    Yields the collection a profile's refreshed documents should be inserted into, then switches the profile
+    over to them once the `with` block succeeds.
+
+    Dedicated profiles are written to a fresh collection that replaces the previous one; in shared partitions
+    the previous rows are deleted only after the new ones are inserted. If the block raises, the new data is
+    discarded and the previous data and registry entry stay in place.
+
+    :param database: The connected database instance.
+    :param profile_name: The Instagram profile name.
+    :param create_options: Options to create a missing partition with (e.g. `dimension`) when the base
+        collection's vector options cannot be read.
+    :raises RuntimeError: If the partition cannot be prepared or the registry cannot be updated.
+    """
+    profile = normalize_profile(profile_name)
+    config = get_partition_config()
+
+    try:
+        registry = _get_registry(database, config)
+        current = lookup_partition(database, profile, use_cache=False)
+        with _lock:
+            target = _plan_partition(registry, config, profile, current)
+    except RuntimeError:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"Failed to prepare the partition of profile '{profile}': {e}")
+
+    reserved = target["dedicated"] and not current
+    try:
+        try:
+            collection = _get_partition(database, config, target["partition"], create_options)
+            if target["dedicated"]:
+                collection.delete_many({})
+                previous_ids = set()
+            else:
+                previous_ids = _list_profile_ids(collection, profile)
+        except RuntimeError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to prepare the partition of profile '{profile}': {e}")
+
+        try:
+            yield collection
+        except BaseException:
+            _discard_refresh(database, collection, target, profile, previous_ids)
+            raise
+
+        try:
+            registry.replace_one({"_id": profile}, target, upsert=True)
+        except Exception as e:
+            _discard_refresh(database, collection, target, profile, previous_ids)
+            raise RuntimeError(f"Failed to register the partition of profile '{profile}': {e}")
+    finally:
+        if reserved:
+            _release_reservation(registry, profile)
+
+    _cache_put(profile, target)
+    _cleanup_previous(database, config, profile, current, target, collection, previous_ids)
+    logging.info(f"Profile '{profile}' refreshed in partition '{target['partition']}'.")
+
+
+def delete_profile(database, profile_name: str) -> bool:
+    """
+    Deletes a profile's data and registry entry. Dedicated partitions are dropped entirely; profiles
+    ingested before partitioning are deleted from the base collection.
+
+    :param database: The connected database instance.
+    :param profile_name: The Instagram profile name.
+    :return: True if any data or registry entry was deleted, False otherwise.
+    :raises RuntimeError: If the data or registry entry cannot be deleted.
+    """
+    profile = normalize_profile(profile_name)
+    config = get_partition_config()
+    entry = lookup_partition(database, profile, use_cache=False)
+
+    try:
+        if not entry:
+            result = database.get_collection(config["base"]).delete_many({"metadata.username": profile})
+            deleted = bool(result.deleted_count)
+        else:
+            if entry["dedicated"]:
+                database.drop_collection(entry["partition"])
+            else:
+                database.get_collection(entry["partition"]).delete_many({"metadata.username": profile})
+            _get_registry(database, config).delete_one({"_id": profile})
+            deleted = True
+    except RuntimeError:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"Failed to delete profile '{profile}': {e}")
+    finally:
+        _cache_evict(profile)
+
+    if deleted:
+        logging.info(f"Deleted profile '{profile}' from partition '{entry['partition'] if entry else config['base']}'.")
+    return deleted
+
+
+def resolve_query_route(profile_name: str = None, get_database=connect_to_database) -> tuple:
+    """
+    Resolves the collection and search filter a query should use.
+
+    Registry entries are cached per process, so repeated queries for the same profile do not connect
+    to the database. Profiles without a registry entry are searched in the base collection.
+
+    :param profile_name: The Instagram profile name, or None to search the collection configured in the flow.
+    :param get_database: A callable returning the database to read the registry with, called only on a
+        cache miss (default opens a new connection).
+    :return: A tuple of the collection name and the search filter (None when not needed).
+    """
+    if not profile_name:
+        return None, None
+
+    profile = normalize_profile(profile_name)
+    hit, entry = _cache_get(profile)
+    if not hit:
+        entry = lookup_partition(get_database(), profile)
+
+    if not entry:
+        return get_partition_config()["base"], {"username": profile}
+    if entry["dedicated"]:
+        return entry["partition"], None
+    return entry["partition"], {"username": profile}
@@ -0,0 +1,239 @@
+"""
+Brief: This file contains the opt-in profiler that records slow API requests with a stage breakdown.
+
+Description: This file contains the `SlowRequestProfiler` class and the `stage` helper. When profiling is
+enabled, a sampled request gets a trace that code along the request path fills with timed stages (e.g. the
+Langflow HTTP call, JSON encoding, admission queue wait) and annotations (e.g. Langflow's per-component
+timings). Traces of requests slower than the threshold are kept in a bounded ring buffer, which
+`register_profiler` exposes on `GET /debug/slow`. When profiling is disabled, or a request is not sampled,
+`stage` and `annotate` do nothing.
+
+The profiler is configured by `register_profiler` from the following environment variables:
+- SLOW_REQUEST_PROFILING: Set to 1 to enable the profiler (disabled by default).
+- SLOW_REQUEST_THRESHOLD_MS: Requests slower than this are recorded (default 2000).
+- SLOW_REQUEST_SAMPLE_RATE: Fraction of requests traced, between 0 and 1 (default 1).
+- SLOW_REQUEST_BUFFER_SIZE: Number of traces kept in the ring buffer (default 50).
+
+Author: Team Genz-AI
+
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+import contextvars
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from services.config_service import env_number
+from errors.value_error import ValueError
+
+logging.basicConfig(
+    level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Times the `with` block as a stage of the current request trace, if there is one.
+
+    :param name: The name of the stage.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def record_stage(name: str, seconds: float):
+    """
+    Records an already measured stage in the current request trace, if there is one.
+
+    :param name: The name of the stage.
+    :param seconds: The duration of the stage in seconds.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace["stages"].append({"name": name, "ms": round(seconds * 1000, 2)})
+
+
+def annotate(key: str, value):
+    """
+    Attaches extra information to the current request trace, if there is one.
+
+    :param key: The annotation name.
+    :param value: A JSON-serializable value.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace["annotations"][key] = value
+
+
+def extract_langflow_timings(response: dict) -> list:
+    """
+    Extracts the per-component timings Langflow reports in a run response.
+
+    :param response: The JSON response of the Langflow run API.
+    :return: A list of `{"component", "seconds", "duration"}` entries, empty if none are reported.
+    """
+    timings = []
+    for run_output in response.get("outputs") or []:
+        for result in run_output.get("outputs") or []:
+            if not isinstance(result, dict) or "timedelta" not in result:
+                continue
+            timings.append({
+                "component": result.get("component_display_name") or result.get("component_id"),
+                "seconds": result.get("timedelta"),
+                "duration": result.get("duration"),
+            })
+    return timings
+
+
+class SlowRequestProfiler:
+    """
+    Samples requests and keeps the traces of slow ones in a bounded ring buffer.
+    """
+
+    def __init__(self, threshold_ms: float, sample_rate: float = 1.0, buffer_size: int = 50):
+        """
+        :param threshold_ms: Requests slower than this are recorded.
+        :param sample_rate: Fraction of requests traced, between 0 and 1.
+        :param buffer_size: Number of traces kept.
+        :raises ValueError: If a setting is out of range.
+        """
+        if threshold_ms < 0 or not 0 <= sample_rate <= 1 or buffer_size < 1:
+            raise ValueError("Invalid slow request profiler settings.")
+
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.recorded = 0
+        self._traces = deque(maxlen=buffer_size)
+        self._lock = threading.Lock()
+
+    def start(self, method: str, path: str):
+        """
+        Starts a trace for the current request if it is sampled.
+
+        :param method: The HTTP method of the request.
+        :param path: The path of the request.
+        :return: A token to pass to `finish`, or None if the request is not sampled.
+        """
+        if random.random() >= self.sample_rate:
+            return None
+
+        trace = {
+            "method": method,
+            "path": path,
+            "started_at": datetime.now(timezone.utc).isoformat(),
+            "stages": [],
+            "annotations": {},
+            "_start": time.perf_counter(),
+        }
+        return _current_trace.set(trace)
+
+    def finish(self, token, status: int = None):
+        """
+        Ends the trace of the current request and records it if it exceeded the threshold.
+
+        :param token: The token returned by `start`.
+        :param status: The HTTP status code of the response, if any.
+        """
+        if token is None:
+            return
+
+        trace = _current_trace.get()
+        _current_trace.reset(token)
+        if trace is None:
+            return
+
+        total_ms = (time.perf_counter() - trace.pop("_start")) * 1000
+        if total_ms < self.threshold_ms:
+            return
+
+        trace["status"] = status
+        trace["total_ms"] = round(total_ms, 2)
+        trace["stages"].insert(0, {"name": "handler", "ms": trace["total_ms"]})
+        with self._lock:
+            self._traces.append(trace)
+            self.recorded += 1
+        logging.warning(
+            f"Slow request {trace['method']} {trace['path']} took {trace['total_ms']} ms: "
+            + ", ".join(f"{s['name']}={s['ms']}ms" for s in trace["stages"][1:])
+        )
+
+    def traces(self) -> list:
+        """
+        :return: The recorded traces, newest first.
+        """
+        with self._lock:
+            return list(reversed(self._traces))
+
+
+def register_profiler(app):
+    """
+    Enables the slow request profiler on a Flask app if SLOW_REQUEST_PROFILING is set.
+
+    :param app: The Flask application.
+    :return: The profiler, or None if profiling is disabled.
+    :raises ValueError: If a setting is invalid.
+    """
+    if os.environ.get("SLOW_REQUEST_PROFILING", "").lower() not in ("1", "true", "yes"):
+        return None
+
+    from flask import g, request, jsonify
+
+    profiler = SlowRequestProfiler(
+        env_number("SLOW_REQUEST_THRESHOLD_MS", 2000),
+        env_number("SLOW_REQUEST_SAMPLE_RATE", 1.0),
+        env_number("SLOW_REQUEST_BUFFER_SIZE", 50, int),
+    )
+
+    @app.before_request
+    def _start_trace():
+        g.profiler_token = profiler.start(request.method, request.path)
+
+    @app.after_request
+    def _finish_trace(response):
+        profiler.finish(g.pop("profiler_token", None), response.status_code)
+        return response
+
+    @app.teardown_request
+    def _discard_trace(exc):
+        profiler.finish(g.pop("profiler_token", None))
+
+    @app.route("/debug/slow", methods=["GET"])
+    def debug_slow_api():
+        """
+        API to list the traces of recent slow requests.
+
+        Response:
+        {
+            "threshold_ms": <Threshold>,
+            "sample_rate": <Sample Rate>,
+            "recorded": <Number Of Slow Requests Recorded>,
+            "traces": [<Trace>, ...]
+        }
+        """
+        return jsonify({
+            "threshold_ms": profiler.threshold_ms,
+            "sample_rate": profiler.sample_rate,
+            "recorded": profiler.recorded,
+            "traces": profiler.traces(),
+        }), 200
+
+    logging.info(
+        f"Slow request profiling enabled (threshold {profiler.threshold_ms} ms, "
+        f"sample rate {profiler.sample_rate})."
+    )
+    return profiler
@@ -4,7 +4,8 @@ Brief: This file contains the functions to query a vector search API and return
 Description: This file contains the function `vector_search` to perform a vector search using 
 the specified query message. The function sends a POST request to the vector search API (langflow) 
 with the input message and returns the JSON response. It also handles errors related to missing 
-environment variables and API request failures.
+environment variables and API request failures. When a collection name or search filter is given, they are 
+passed to the flow's AstraDB search component as tweaks, so queries are routed to a profile's partition.
 
 Author: Team Genz-AI
 
@@ -13,18 +14,25 @@ Author: Team Genz-AI
 import os
 import requests
 import logging
+from services.profiling_service import stage, annotate, extract_langflow_timings
 from errors.runtime_error import RuntimeError
 
+DEFAULT_SEARCH_COMPONENT_ID = "AstraDB-MR04H"
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
 
-def vector_search(query_message: str) -> dict:
+def vector_search(
+    query_message: str, collection_name: str = None, search_filter: dict = None
+) -> dict:
     """
     Perform a vector search using the specified query message.
 
     :param query_message: The input message to query the vector search.
+    :param collection_name: The collection to search instead of the one configured in the flow.
+    :param search_filter: A metadata filter applied to the search (e.g. `{"username": "<profile>"}`).
     :return: The JSON response from the vector search API.
     :raises RuntimeError: If the environment variables are not properly set or the API request fails.
     """
@@ -46,17 +54,33 @@ def vector_search(query_message: str) -> dict:
             "output_type": "chat",
             "input_type": "chat",
         }
+
+        tweaks = {}
+        if collection_name:
+            tweaks["collection_name"] = collection_name
+        if search_filter:
+            tweaks["search_filter"] = search_filter
+        if tweaks:
+            component_id = os.environ.get("LANGFLOW_SEARCH_COMPONENT_ID", DEFAULT_SEARCH_COMPONENT_ID)
+            payload["tweaks"] = {component_id: tweaks}
+
         headers = {
             "Authorization": f"Bearer {application_token}",
             "Content-Type": "application/json",
         }
 
         logging.info(f"Sending vector search request to: {api_url}")
-        response = requests.post(api_url, json=payload, headers=headers)
+        with stage("http_client"):
+            response = requests.post(api_url, json=payload, headers=headers)
         response.raise_for_status()
 
-        logging.info("Vector search request successful.")
-        return response.json()
+        with stage("response_decoding"):
+            result = response.json()
+        annotate("langflow_components", extract_langflow_timings(result))
+        annotate("http_client_elapsed_ms", round(response.elapsed.total_seconds() * 1000, 2))
+
+        logging.info(f"Vector search request successful in {response.elapsed.total_seconds():.2f}s.")
+        return result
     except requests.exceptions.RequestException as e:
         logging.error(f"API request failed: {e}")
         raise RuntimeError(f"An error occurred while performing the vector search: {e}")
@@ -19,11 +19,12 @@ export async function processInstagramData(username: string) {
   return data;
 }
 
-export async function getChatResponse(message: string, instagramData?: any) {
+export async function getChatResponse(message: string, instagramId?: string) {
   // This would connect to your AI service to get responses
     // Define the body of the POST request
     const body = {
-      query: message
+      query: message,
+      instagram_id: instagramId
     };
 
     // Send a POST request
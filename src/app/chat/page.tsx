@@ -56,7 +56,7 @@ export default function ChatInterface() {
     setLoading(true)
 
     try {
-      const response = await getChatResponse(userMessage)
+      const response = await getChatResponse(userMessage, instagramId)
       setMessages(prev => [...prev, { role: 'assistant', content: response.response }])
     } catch (error) {
       setMessages(prev => [...prev, {